@@ -1,32 +1,367 @@
 import streamlit as st
 import random
+import re
 import requests
-import spacy
-import pythainlp
-from pythainlp.tokenize import word_tokenize
-from pythainlp.tag import pos_tag
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Optional, Tuple
-import pandas as pd
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib import util as importlib_util
 
-# Try to import NLP libraries
-try:
+# Check NLP library availability without paying their import cost up front;
+# the actual imports happen lazily inside the cached loaders below, so users
+# who never start a game (e.g. only view the reference table) skip them
+SPACY_AVAILABLE = importlib_util.find_spec("spacy") is not None
+
+PYTHAINLP_AVAILABLE = importlib_util.find_spec("pythainlp") is not None
+if not PYTHAINLP_AVAILABLE:
+    st.warning("PyThaiNLP not installed. Install with: pip install pythainlp")
+
+# Shared HTTP session: keep-alive avoids a fresh TCP+TLS handshake against
+# the ngrok endpoint on every call, and transient 5xx errors are retried
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+))
+
+# Single-pass word extraction for the no-spaCy English fallback
+_EN_WORD_RE = re.compile(r"[A-Za-z']+")
+
+# Whitespace characters newmm emits as standalone tokens
+_SPACE_CHARS = {' ', '\t', '\n', '　', '\xa0'}
+
+# Map spaCy / PyThaiNLP POS tags to our simplified categories
+# (module-level so the dicts aren't rebuilt inside the token loops)
+_EN_POS_MAP = {
+    'NOUN': 'NOUN', 'PROPN': 'NOUN',
+    'PRON': 'PRON',
+    'VERB': 'VERB', 'AUX': 'VERB',
+    'ADJ': 'ADJ',
+    'ADV': 'ADV',
+    'ADP': 'ADP',
+    'CONJ': 'CONJ', 'CCONJ': 'CONJ', 'SCONJ': 'CONJ',
+    'INTJ': 'INTJ'
+}
+
+_TH_POS_MAP = {
+    'NOUN': 'NOUN', 'NCMN': 'NOUN', 'NPRP': 'NOUN',
+    'PRON': 'PRON', 'PPRS': 'PRON',
+    'VERB': 'VERB', 'VACT': 'VERB', 'VSTA': 'VERB',
+    'ADJ': 'ADJ', 'ADJV': 'ADJ',
+    'ADV': 'ADV', 'ADVN': 'ADV',
+    'PREP': 'ADP',
+    'CONJ': 'CONJ', 'CCONJ': 'CONJ',
+    'INTJ': 'INTJ'
+}
+
+_POS_CATEGORIES = {
+    'en': {
+        'NOUN': 'Noun (คำนาม)',
+        'PRON': 'Pronoun (คำสรรพนาม)',
+        'VERB': 'Verb (คำกริยา)',
+        'ADJ': 'Adjective (คำคุณศัพท์)',
+        'ADV': 'Adverb (คำกริยาวิเศษณ์)',
+        'ADP': 'Preposition (คำบุพบท)',
+        'CONJ': 'Conjunction (คำสันธาน)',
+        'INTJ': 'Interjection (คำอุทาน)'
+    },
+    'th': {
+        'NOUN': 'คำนาม (Noun)',
+        'PRON': 'คำสรรพนาม (Pronoun)',
+        'VERB': 'คำกริยา (Verb)',
+        'ADJ': 'คำคุณศัพท์ (Adjective)',
+        'ADV': 'คำกริยาวิเศษณ์ (Adverb)',
+        'ADP': 'คำบุพบท (Preposition)',
+        'CONJ': 'คำสันธาน (Conjunction)',
+        'INTJ': 'คำอุทาน (Interjection)'
+    }
+}
+
+@st.cache_resource
+def _load_spacy_en():
+    """Load the English spaCy model once per process (shared across sessions)
+
+    POS classification needs the tagger plus the attribute_ruler — the
+    tagger only assigns fine-grained token.tag, and the ruler maps that
+    to the coarse token.pos_ read below — so just the expensive
+    parser/NER/lemmatizer components are disabled.
+    """
     import spacy
-    SPACY_AVAILABLE = True
-except ImportError:
-    SPACY_AVAILABLE = False
+    return spacy.load("en_core_web_sm", disable=["parser", "ner", "lemmatizer"])
+
+_SPACY_MODEL_WARNED = False
+
+def _get_nlp_en():
+    """Return the cached English pipeline, or None if spaCy/model is missing"""
+    global _SPACY_MODEL_WARNED
+    if not SPACY_AVAILABLE:
+        return None
+    try:
+        return _load_spacy_en()
+    except OSError:
+        if not _SPACY_MODEL_WARNED:
+            st.warning("English spaCy model not found. Install with: python -m spacy download en_core_web_sm")
+            _SPACY_MODEL_WARNED = True
+        return None
+
+@st.cache_resource
+def _load_thai_tagger():
+    """Load PyThaiNLP's trained perceptron POS tagger once per process
 
-try:
-    import pythainlp
-    from pythainlp import word_tokenize
+    PerceptronTagger() without a model path is an untrained shell that
+    raises on every tag() call, so cache a thin wrapper around
+    pos_tag(engine='perceptron'), which loads the trained orchid model.
+    The warm-up call makes a broken install fail here (where
+    _get_thai_tagger remembers it) instead of on every sentence.
+    """
     from pythainlp.tag import pos_tag
-    PYTHAINLP_AVAILABLE = True
-except ImportError:
-    PYTHAINLP_AVAILABLE = False
-    st.warning("PyThaiNLP not installed. Install with: pip install pythainlp")
 
-@dataclass
+    class _PerceptronPosTagger:
+        @staticmethod
+        def tag(words):
+            return pos_tag(words, engine='perceptron')
+
+    tagger = _PerceptronPosTagger()
+    tagger.tag(['ทดสอบ'])  # force the trained model load now
+    return tagger
+
+def _fallback_tags(words: List[str]) -> List[Tuple[str, str]]:
+    """Default tagging when no tagger is available: unique words tagged once"""
+    unique_pos = dict.fromkeys(words, 'NOUN')
+    return [(word, unique_pos[word]) for word in words]
+
+_TH_TAGGER_FAILED = False
+
+def _get_thai_tagger():
+    """Return the cached perceptron tagger, or None if it failed to load
+
+    The failure is remembered so a broken install doesn't retry the model
+    load on every analyzed sentence.
+    """
+    global _TH_TAGGER_FAILED
+    if _TH_TAGGER_FAILED:
+        return None
+    try:
+        return _load_thai_tagger()
+    except Exception:
+        _TH_TAGGER_FAILED = True
+        return None
+
+@st.cache_resource
+def _load_thai_tokenizer():
+    """Build a newmm Tokenizer once with the default Thai dictionary Trie
+
+    Calling the word_tokenize free function re-resolves the engine and
+    dictionary on every call; a prebuilt Tokenizer instance skips that.
+    """
+    from pythainlp.corpus.common import thai_words
+    from pythainlp.tokenize import Tokenizer
+    return Tokenizer(custom_dict=thai_words(), engine='newmm')
+
+# คำอธิบายและตัวอย่างของ Parts of Speech แต่ละชนิด
+_POS_EXAMPLES = {
+    'en': {
+        'NOUN': {
+            'desc': "คำนาม - คำที่เป็นชื่อคน สถานที่ สิ่งของ หรือแนวคิด",
+            'examples': "cat (แมว), city (เมือง), happiness (ความสุข), John (จอห์น)",
+            'sentence': "The cat sleeps on the sofa. / My happiness comes from helping others."
+        },
+        'VERB': {
+            'desc': "คำกริยา - คำที่แสดงการกระทำหรือสถานะ",
+            'examples': "run (วิ่ง), eat (กิน), think (คิด), sleep (นอน)",
+            'sentence': "She runs every morning. / I think about you."
+        },
+        'ADJ': {
+            'desc': "คำคุณศัพท์ - คำที่ขยายความคำนาม",
+            'examples': "happy (มีความสุข), green (สีเขียว), beautiful (สวยงาม)",
+            'sentence': "The happy child played. / She has beautiful eyes."
+        },
+        'ADV': {
+            'desc': "คำวิเศษณ์ - คำที่ขยายความคำกริยา คำคุณศัพท์ หรือคำวิเศษณ์อื่น",
+            'examples': "quickly (อย่างรวดเร็ว), very (มาก), extremely (อย่างยิ่ง)",
+            'sentence': "He runs quickly. / She is very smart."
+        },
+        'PRON': {
+            'desc': "คำสรรพนาม - คำที่ใช้แทนคำนาม",
+            'examples': "I (ฉัน), you (คุณ), he (เขา), she (เธอ), it (มัน)",
+            'sentence': "She gave it to me. / They went to the store."
+        },
+        'DET': {
+            'desc': "คำนำหน้านาม - คำที่นำหน้าและกำหนดความชัดเจนของคำนาม",
+            'examples': "the (คำนำหน้านามเฉพาะเจาะจง), a, an (คำนำหน้านามไม่เฉพาะเจาะจง), this (นี้)",
+            'sentence': "The dog barked. / This book is interesting."
+        },
+        'ADP': {
+            'desc': "คำบุพบท - คำที่แสดงความสัมพันธ์ระหว่างคำนามกับส่วนอื่นในประโยค",
+            'examples': "in (ใน), on (บน), at (ที่), with (กับ), by (โดย)",
+            'sentence': "The cat is on the table. / She walked with her friend."
+        },
+        'CONJ': {
+            'desc': "คำสันธาน - คำที่เชื่อมคำ วลี หรือประโยคเข้าด้วยกัน",
+            'examples': "and (และ), but (แต่), or (หรือ), because (เพราะ)",
+            'sentence': "I like tea and coffee. / He ran because he was late."
+        },
+        'INTJ': {
+            'desc': "คำอุทาน - คำที่แสดงอารมณ์หรือความรู้สึกอย่างฉับพลัน",
+            'examples': "wow (ว้าว), oh (โอ้), ah (อา), ouch (โอ๊ย)",
+            'sentence': "Wow! That's amazing. / Oh, I didn't see you there."
+        },
+        'NUM': {
+            'desc': "คำบอกจำนวน - คำที่แสดงจำนวนหรือลำดับ",
+            'examples': "one (หนึ่ง), two (สอง), first (ที่หนึ่ง), second (ที่สอง)",
+            'sentence': "I have two cats. / She won first place in the competition."
+        },
+        'AUX': {
+            'desc': "คำช่วยกริยา - คำที่ช่วยคำกริยาหลักในการแสดงกาล มุมมอง หรือทัศนคติ",
+            'examples': "can (สามารถ), will (จะ), must (ต้อง), should (ควร)",
+            'sentence': "You should study. / He can swim very well."
+        },
+        'PART': {
+            'desc': "อนุภาค - คำที่ทำหน้าที่เฉพาะทางไวยากรณ์",
+            'examples': "to (ใน 'to go'), 's (ใน 'John's')",
+            'sentence': "I want to sleep. / That's John's book."
+        }
+    },
+    'th': {
+        'NOUN': {
+            'desc': "คำนาม - คำที่เป็นชื่อคน สถานที่ สิ่งของ หรือแนวคิด",
+            'examples': "แมว (cat), เมือง (city), ความสุข (happiness), สมชาย (personal name)",
+            'sentence': "แมวนอนอยู่บนโซฟา / ความสุขของฉันมาจากการช่วยเหลือผู้อื่น"
+        },
+        'VERB': {
+            'desc': "คำกริยา - คำที่แสดงการกระทำหรือสถานะ",
+            'examples': "วิ่ง (run), กิน (eat), คิด (think), นอน (sleep)",
+            'sentence': "เธอวิ่งทุกเช้า / ฉันคิดถึงคุณ"
+        },
+        'ADJ': {
+            'desc': "คำคุณศัพท์ - คำที่ขยายความคำนาม",
+            'examples': "มีความสุข (happy), สีเขียว (green), สวยงาม (beautiful)",
+            'sentence': "เด็กที่มีความสุขกำลังเล่น / เธอมีดวงตาที่สวยงาม"
+        },
+        'ADV': {
+            'desc': "คำวิเศษณ์ - คำที่ขยายความคำกริยา คำคุณศัพท์ หรือคำวิเศษณ์อื่น",
+            'examples': "อย่างรวดเร็ว (quickly), มาก (very), อย่างยิ่ง (extremely)",
+            'sentence': "เขาวิ่งอย่างรวดเร็ว / เธอฉลาดมาก"
+        },
+        'PRON': {
+            'desc': "คำสรรพนาม - คำที่ใช้แทนคำนาม",
+            'examples': "ฉัน (I), คุณ (you), เขา (he/she), มัน (it), พวกเขา (they)",
+            'sentence': "เธอให้มันแก่ฉัน / พวกเขาไปที่ร้านค้า"
+        },
+        'DET': {
+            'desc': "คำนำหน้านาม - คำที่นำหน้าและกำหนดความชัดเจนของคำนาม",
+            'examples': "นี้ (this), นั้น (that), เหล่านี้ (these), นั่น (those)",
+            'sentence': "หนังสือเล่มนี้น่าสนใจ / เด็กคนนั้นกำลังวิ่ง"
+        },
+        'ADP': {
+            'desc': "คำบุพบท - คำที่แสดงความสัมพันธ์ระหว่างคำนามกับส่วนอื่นในประโยค",
+            'examples': "ใน (in), บน (on), ที่ (at), กับ (with), โดย (by)",
+            'sentence': "แมวอยู่บนโต๊ะ / เธอเดินไปกับเพื่อนของเธอ"
+        },
+        'CONJ': {
+            'desc': "คำสันธาน - คำที่เชื่อมคำ วลี หรือประโยคเข้าด้วยกัน",
+            'examples': "และ (and), แต่ (but), หรือ (or), เพราะ (because)",
+            'sentence': "ฉันชอบชาและกาแฟ / เขาวิ่งเพราะเขามาสาย"
+        },
+        'INTJ': {
+            'desc': "คำอุทาน - คำที่แสดงอารมณ์หรือความรู้สึกอย่างฉับพลัน",
+            'examples': "ว้าว (wow), โอ้ (oh), อา (ah), โอ๊ย (ouch)",
+            'sentence': "ว้าว! นั่นมหัศจรรย์มาก / โอ้ ฉันไม่เห็นคุณอยู่ตรงนั้น"
+        },
+        'NUM': {
+            'desc': "คำบอกจำนวน - คำที่แสดงจำนวนหรือลำดับ",
+            'examples': "หนึ่ง (one), สอง (two), ที่หนึ่ง (first), ที่สอง (second)",
+            'sentence': "ฉันมีแมวสองตัว / เธอชนะที่หนึ่งในการแข่งขัน"
+        },
+        'AUX': {
+            'desc': "คำช่วยกริยา - คำที่ช่วยคำกริยาหลักในการแสดงกาล มุมมอง หรือทัศนคติ",
+            'examples': "จะ (will), ได้ (can), ต้อง (must), ควร (should)",
+            'sentence': "คุณควรจะศึกษา / เขาสามารถว่ายน้ำได้ดีมาก"
+        },
+        'PART': {
+            'desc': "อนุภาค - คำที่ทำหน้าที่เฉพาะทางไวยากรณ์",
+            'examples': "ได้, ไหม, นะ, สิ, เลย",
+            'sentence': "คุณไปได้ไหม / กินข้าวกันนะ"
+        }
+    }
+}
+
+# CSS ทั้งหมดของแอป รวมไว้ก้อนเดียวและส่งครั้งเดียวต่อ session
+_CSS = """
+<style>
+.pos-table {
+    width: 100%;
+    border-collapse: collapse;
+    margin: 20px 0;
+}
+.pos-table th, .pos-table td {
+    border: 1px solid #ddd;
+    padding: 8px 12px;
+    text-align: left;
+}
+.pos-table th {
+    background-color: #f0f2f6;
+    font-weight: bold;
+}
+.pos-table tr:nth-child(even) {
+    background-color: #f9f9f9;
+}
+.pos-table tr:hover {
+    background-color: #e6f2ff;
+}
+.table-container {
+    display: flex;
+    justify-content: center;
+    margin: 20px 0;
+}
+.centered-df {
+    width: 90%;
+    margin: 0 auto;
+    border-collapse: collapse;
+    box-shadow: 0 2px 3px rgba(0,0,0,0.1);
+}
+.centered-df th, .centered-df td {
+    text-align: center !important;
+    padding: 10px;
+    border: 1px solid #ddd;
+}
+.centered-df th {
+    background-color: #f0f2f6;
+    font-weight: bold;
+}
+.centered-df tr:nth-child(even) {
+    background-color: #f9f9f9;
+}
+.centered-df tr:hover {
+    background-color: #e6f2ff;
+}
+</style>
+"""
+
+@st.cache_data
+def _render_pos_reference_html(language: str) -> str:
+    """Build the POS reference table HTML for a language (cached per language)"""
+    html_table = "<table class='pos-table'>"
+    html_table += "<tr><th>Part of Speech</th><th>Description / คำอธิบาย</th><th>Examples / ตัวอย่าง</th><th>Sentence / ประโยคตัวอย่าง</th></tr>"
+
+    for pos_code, pos_name in _POS_CATEGORIES[language].items():
+        if pos_code in _POS_EXAMPLES[language]:
+            desc = _POS_EXAMPLES[language][pos_code]['desc']
+            examples = _POS_EXAMPLES[language][pos_code]['examples']
+            sentence = _POS_EXAMPLES[language][pos_code]['sentence']
+            html_table += f"<tr><td><b>{pos_name}</b> ({pos_code})</td><td>{desc}</td><td>{examples}</td><td>{sentence}</td></tr>"
+
+    html_table += "</table>"
+    return html_table
+
 class WordInfo:
+    # __slots__ avoids a per-instance __dict__; hard sentences allocate
+    # dozens of these per game, and typoed attributes now fail loudly
+    __slots__ = ('word', 'pos', 'pos_name', 'user_answer', 'is_correct', 'index')
+
     def __init__(self, word: str, pos: str, index: int):
         self.word = word
         self.pos = pos
@@ -37,29 +372,9 @@ class WordInfo:
 
 class POSGame:
     def __init__(self):
-        self.pos_categories = {
-            'en': {
-                'NOUN': 'Noun (คำนาม)',
-                'PRON': 'Pronoun (คำสรรพนาม)', 
-                'VERB': 'Verb (คำกริยา)',
-                'ADJ': 'Adjective (คำคุณศัพท์)',
-                'ADV': 'Adverb (คำกริยาวิเศษณ์)',
-                'ADP': 'Preposition (คำบุพบท)',
-                'CONJ': 'Conjunction (คำสันธาน)',
-                'INTJ': 'Interjection (คำอุทาน)'
-            },
-            'th': {
-                'NOUN': 'คำนาม (Noun)',
-                'PRON': 'คำสรรพนาม (Pronoun)',
-                'VERB': 'คำกริยา (Verb)', 
-                'ADJ': 'คำคุณศัพท์ (Adjective)',
-                'ADV': 'คำกริยาวิเศษณ์ (Adverb)',
-                'ADP': 'คำบุพบท (Preposition)',
-                'CONJ': 'คำสันธาน (Conjunction)',
-                'INTJ': 'คำอุทาน (Interjection)'
-            }
-        }
-        
+        self.pos_categories = _POS_CATEGORIES
+
+
         # Sample sentences for demo (when LLM is not available)
         self.sample_sentences = {
             'en': {
@@ -97,17 +412,13 @@ class POSGame:
                 ]
             }
         }
-        
-        # Load spaCy models if available
-        if SPACY_AVAILABLE:
-            try:
-                self.nlp_en = spacy.load("en_core_web_sm")
-            except OSError:
-                st.warning("English spaCy model not found. Install with: python -m spacy download en_core_web_sm")
-                self.nlp_en = None
-        else:
-            self.nlp_en = None
-    
+
+    @property
+    def nlp_en(self):
+        """English spaCy pipeline, loaded lazily on first use"""
+        return _get_nlp_en()
+
+
     def generate_sentence_with_llm(self, language: str, difficulty: str, api_url: str = None) -> tuple:
         """Generate sentence using LLM API or fallback to samples
         
@@ -116,22 +427,32 @@ class POSGame:
         """
         # Try to call API if URL is provided
         if api_url:
+            # ใช้ sentence pool ที่ขอมาเป็นชุด - ถ้ายังมีประโยคเหลือไม่ต้องเรียก API ซ้ำ
+            pool = st.session_state.setdefault('sentence_pool', {}).setdefault(language, [])
+            if pool:
+                return pool.pop()
+
             try:
-                # ส่งเฉพาะ language ไปยัง API ใหม่ (ไม่ต้องส่ง difficulty)
-                response = requests.post(
+                # ขอหลายประโยคต่อหนึ่ง request เพื่อลด HTTP round-trips
+                response = _HTTP.post(
                     f"{api_url}/generate_sentence",
                     json={
-                        'language': language
+                        'language': language,
+                        'count': 5
                     },
                     timeout=75
                 )
-                
+
                 if response.status_code == 200:
                     data = response.json()
-                    if data.get('success') and data.get('sentence'):
-                        # ส่งคืนทั้งประโยคและระดับความยากที่ได้จาก API
-                        actual_difficulty = data.get('difficulty', difficulty)
-                        return data['sentence'], actual_difficulty
+                    if data.get('success'):
+                        # รองรับทั้ง API แบบชุด (sentences) และแบบเดี่ยว (sentence)
+                        sentences = data.get('sentences') or ([data['sentence']] if data.get('sentence') else [])
+                        difficulties = data.get('difficulties') or [data.get('difficulty', difficulty)] * len(sentences)
+                        if sentences:
+                            pool.extend(zip(sentences, difficulties))
+                            return pool.pop()
+                        st.warning("API returned no sentences. Using fallback sentences.")
                     else:
                         st.warning(f"API returned error: {data.get('error', 'Unknown error')}")
                 else:
@@ -151,83 +472,125 @@ class POSGame:
     def analyze_sentence_english(self, sentence: str) -> List[WordInfo]:
         """Analyze English sentence using spaCy"""
         if not self.nlp_en:
-            # Fallback analysis
-            words = sentence.replace('.', '').replace(',', '').split()
-            return [WordInfo(word=word, pos='NOUN', index=i) for i, word in enumerate(words)]
-        
-        doc = self.nlp_en(sentence)
-        word_infos = []
+            # Fallback analysis: tag each unique word once and look repeats up
+            # (position-independent, unlike the contextual spaCy path)
+            words = _EN_WORD_RE.findall(sentence)
+            unique_pos = dict.fromkeys(words, 'NOUN')
+            return [WordInfo(word=word, pos=unique_pos[word], index=i) for i, word in enumerate(words)]
         
-        for i, token in enumerate(doc):
-            if token.is_alpha:  # Only process alphabetic tokens
-                # Map spaCy POS to our simplified categories
-                pos_mapping = {
-                    'NOUN': 'NOUN', 'PROPN': 'NOUN',
-                    'PRON': 'PRON',
-                    'VERB': 'VERB', 'AUX': 'VERB',
-                    'ADJ': 'ADJ',
-                    'ADV': 'ADV',
-                    'ADP': 'ADP',
-                    'CONJ': 'CONJ', 'CCONJ': 'CONJ', 'SCONJ': 'CONJ',
-                    'INTJ': 'INTJ'
-                }
-                
-                simplified_pos = pos_mapping.get(token.pos_, 'NOUN')
-                word_infos.append(WordInfo(
-                    word=token.text,
-                    pos=simplified_pos,
-                    index=i
-                ))
-        
-        return word_infos
+        return self._word_infos_from_doc(self.nlp_en(sentence))
+
+    def _word_infos_from_doc(self, doc) -> List[WordInfo]:
+        """Convert a spaCy Doc into WordInfo objects with simplified POS tags"""
+        # Only process alphabetic tokens
+        return [
+            WordInfo(word=token.text, pos=_EN_POS_MAP.get(token.pos_, 'NOUN'), index=i)
+            for i, token in enumerate(doc) if token.is_alpha
+        ]
     
     def analyze_sentence_thai(self, sentence: str) -> List[WordInfo]:
         """Analyze Thai sentence using PyThaiNLP"""
         if not PYTHAINLP_AVAILABLE:
             # Fallback analysis
-            words = word_tokenize(sentence, engine='newmm') if PYTHAINLP_AVAILABLE else sentence.split()
+            words = sentence.split()
             return [WordInfo(word=word, pos='NOUN', index=i) for i, word in enumerate(words) if word.strip()]
+
+        # Tokenize with the cached newmm Tokenizer (no per-call engine dispatch)
+        words = _load_thai_tokenizer().word_tokenize(sentence)
         
-        # Tokenize
-        words = word_tokenize(sentence, engine='newmm')
-        
-        # POS tagging
+        # POS tagging (cached tagger instance; load failures short-circuit)
+        tagger = _get_thai_tagger()
         try:
-            pos_tags = pos_tag(words, engine='perceptron')
+            pos_tags = tagger.tag(words) if tagger else _fallback_tags(words)
         except:
-            pos_tags = [(word, 'NOUN') for word in words]
-        
-        word_infos = []
-        
-        for i, (word, pos) in enumerate(pos_tags):
-            if word.strip() and not word.isspace():
-                # Map Thai POS to our simplified categories
-                pos_mapping = {
-                    'NOUN': 'NOUN', 'NCMN': 'NOUN', 'NPRP': 'NOUN',
-                    'PRON': 'PRON', 'PPRS': 'PRON',
-                    'VERB': 'VERB', 'VACT': 'VERB', 'VSTA': 'VERB',
-                    'ADJ': 'ADJ', 'ADJV': 'ADJ',
-                    'ADV': 'ADV', 'ADVN': 'ADV',
-                    'PREP': 'ADP',
-                    'CONJ': 'CONJ', 'CCONJ': 'CONJ',
-                    'INTJ': 'INTJ'
-                }
-                
-                simplified_pos = pos_mapping.get(pos, 'NOUN')
-                word_infos.append(WordInfo(
-                    word=word,
-                    pos=simplified_pos,
-                    index=i
-                ))
+            pos_tags = _fallback_tags(words)
         
-        return word_infos
+        return [
+            WordInfo(word=word, pos=_TH_POS_MAP.get(pos, 'NOUN'), index=i)
+            for i, (word, pos) in enumerate(pos_tags)
+            if word and word[0] not in _SPACE_CHARS
+        ]
     
     def analyze_sentence(self, sentence: str, language: str) -> List[WordInfo]:
-        """Analyze sentence based on language"""
-        if language == 'en':
-            return self.analyze_sentence_english(sentence)
-        else:
-            return self.analyze_sentence_thai(sentence)
+        """Analyze sentence based on language (tagging memoized per sentence)"""
+        pairs = _tagged_words(self, sentence, language)
+        return [WordInfo(word=word, pos=pos, index=i) for i, (word, pos) in enumerate(pairs)]
+
+    def analyze_sentences_batch(self, sentences: List[str], language: str) -> List[List[WordInfo]]:
+        """Analyze several sentences at once using nlp.pipe batching
+
+        Batching shares tokenizer overhead and vectorizes tagger inference,
+        so pre-analyzing a pool of sentences is much cheaper than one
+        analyze_sentence call per sentence.
+        """
+        if language == 'en' and self.nlp_en:
+            docs = self.nlp_en.pipe(sentences, batch_size=32)
+            return [self._word_infos_from_doc(doc) for doc in docs]
+        return [self.analyze_sentence(sentence, language) for sentence in sentences]
+
+_RESULTS_COLUMNS = ("Word / คำ",
+                    "Your Answer / คำตอบของคุณ",
+                    "Result / ผลลัพธ์",
+                    "Correct Answer / เฉลย")
+
+@st.cache_data
+def _render_results_table(rows: tuple) -> str:
+    """Render the results summary table HTML (cached on the immutable rows)"""
+    header = ''.join(f'<th>{col}</th>' for col in _RESULTS_COLUMNS)
+    body = ''.join(
+        '<tr>' + ''.join(f'<td>{cell}</td>' for cell in row) + '</tr>'
+        for row in rows
+    )
+    html_table = f"<table class='centered-df'><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table>"
+    # ใส่ div ครอบตารางเพื่อจัดกึ่งกลาง
+    return f'<div class="table-container">{html_table}</div>'
+
+@lru_cache(maxsize=512)
+def _tagged_words(game: POSGame, sentence: str, language: str) -> Tuple[Tuple[str, str], ...]:
+    """Tokenize and tag a sentence, memoized on the sentence string
+
+    The sample-sentence pools are tiny, so across "Play Again" rounds the
+    same sentence is analyzed repeatedly; caching the (word, pos) tuples
+    skips the whole spaCy/PyThaiNLP call on a hit. WordInfo objects are
+    rebuilt fresh by the caller since they hold mutable per-game state.
+    """
+    if language == 'en':
+        word_infos = game.analyze_sentence_english(sentence)
+    else:
+        word_infos = game.analyze_sentence_thai(sentence)
+    return tuple((word_info.word, word_info.pos) for word_info in word_infos)
+
+def _fetch_and_analyze(game: POSGame, language: str, difficulty: str, api_url: Optional[str]) -> tuple:
+    """Fetch and analyze the next sentence (runs in a background thread)
+
+    Must not touch st.session_state or emit Streamlit warnings because it
+    runs outside the script thread; API errors just fall back to samples.
+
+    Returns:
+        tuple: (sentence, actual_difficulty, word_infos)
+    """
+    sentence = None
+    actual_difficulty = difficulty
+    if api_url:
+        try:
+            response = _HTTP.post(
+                f"{api_url}/generate_sentence",
+                json={'language': language},
+                timeout=75
+            )
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('success') and data.get('sentence'):
+                    sentence = data['sentence']
+                    actual_difficulty = data.get('difficulty', difficulty)
+        except Exception:
+            sentence = None
+
+    if sentence is None:
+        sentence = random.choice(game.sample_sentences[language][difficulty])
+        actual_difficulty = difficulty
+
+    return sentence, actual_difficulty, game.analyze_sentence(sentence, language)
 
 def main():
     st.set_page_config(
@@ -267,8 +630,11 @@ def main():
     if 'difficulty_select' not in st.session_state:
         st.session_state.difficulty_select = 'medium'  # Default to medium
     
+    # ส่ง CSS รวมก้อนเดียวต่อการ render (เดิมแยกสองก้อนซ้ำซ้อนกัน)
+    st.markdown(_CSS, unsafe_allow_html=True)
+
     # Title and description
-    
+
     # Title
     st.title("🎮 Parts of Speech Game")
     st.markdown("### เกมจับคู่ชนิดของคำ - Word Classification Game")
@@ -318,7 +684,7 @@ def main():
             # Test API connection
             if api_url and st.button("🔍 Test API Connection"):
                 try:
-                    response = requests.get(f"{api_url}/health", timeout=10)
+                    response = _HTTP.get(f"{api_url}/health", timeout=10)
                     if response.status_code == 200:
                         data = response.json()
                         if data.get('status') == 'healthy':
@@ -342,6 +708,17 @@ def main():
             
             # Analyze the sentence
             word_infos = st.session_state.game.analyze_sentence(sentence, language)
+
+            # Pre-analyze the fallback pool for this setting in one batched
+            # pipe call so "Play Again" can reuse cached analyses instantly
+            if 'prefetched' not in st.session_state:
+                st.session_state.prefetched = {}
+            pool_key = (language, difficulty)
+            if pool_key not in st.session_state.prefetched:
+                pool = st.session_state.game.sample_sentences[language][difficulty]
+                analyses = st.session_state.game.analyze_sentences_batch(pool, language)
+                st.session_state.prefetched[pool_key] = dict(zip(pool, analyses))
+
             st.session_state.current_sentence = sentence
             st.session_state.word_infos = word_infos
             st.session_state.game_started = True
@@ -352,7 +729,14 @@ def main():
             for word_info in st.session_state.word_infos:
                 word_info.user_answer = ""
                 word_info.is_correct = False
-            
+
+            # Prefetch the next round in the background while the user plays,
+            # so "Play Again" doesn't block on the LLM API call
+            if 'executor' not in st.session_state:
+                st.session_state.executor = ThreadPoolExecutor(max_workers=2)
+            st.session_state.next_future = st.session_state.executor.submit(
+                _fetch_and_analyze, st.session_state.game, language, difficulty, api_url)
+
             st.rerun()
         
         # ไม่แสดงคะแนนและความแม่นยำในหน้า Game Setting
@@ -365,175 +749,8 @@ def main():
         # Show POS categories reference with examples
         st.markdown("### 📚 Parts of Speech Reference / อ้างอิงชนิดของคำ")
         
-        # คำอธิบายและตัวอย่างของ Parts of Speech แต่ละชนิด
-        pos_examples = {
-            'en': {
-                'NOUN': {
-                    'desc': "คำนาม - คำที่เป็นชื่อคน สถานที่ สิ่งของ หรือแนวคิด",
-                    'examples': "cat (แมว), city (เมือง), happiness (ความสุข), John (จอห์น)",
-                    'sentence': "The cat sleeps on the sofa. / My happiness comes from helping others."
-                },
-                'VERB': {
-                    'desc': "คำกริยา - คำที่แสดงการกระทำหรือสถานะ",
-                    'examples': "run (วิ่ง), eat (กิน), think (คิด), sleep (นอน)",
-                    'sentence': "She runs every morning. / I think about you."
-                },
-                'ADJ': {
-                    'desc': "คำคุณศัพท์ - คำที่ขยายความคำนาม",
-                    'examples': "happy (มีความสุข), green (สีเขียว), beautiful (สวยงาม)",
-                    'sentence': "The happy child played. / She has beautiful eyes."
-                },
-                'ADV': {
-                    'desc': "คำวิเศษณ์ - คำที่ขยายความคำกริยา คำคุณศัพท์ หรือคำวิเศษณ์อื่น",
-                    'examples': "quickly (อย่างรวดเร็ว), very (มาก), extremely (อย่างยิ่ง)",
-                    'sentence': "He runs quickly. / She is very smart."
-                },
-                'PRON': {
-                    'desc': "คำสรรพนาม - คำที่ใช้แทนคำนาม",
-                    'examples': "I (ฉัน), you (คุณ), he (เขา), she (เธอ), it (มัน)",
-                    'sentence': "She gave it to me. / They went to the store."
-                },
-                'DET': {
-                    'desc': "คำนำหน้านาม - คำที่นำหน้าและกำหนดความชัดเจนของคำนาม",
-                    'examples': "the (คำนำหน้านามเฉพาะเจาะจง), a, an (คำนำหน้านามไม่เฉพาะเจาะจง), this (นี้)",
-                    'sentence': "The dog barked. / This book is interesting."
-                },
-                'ADP': {
-                    'desc': "คำบุพบท - คำที่แสดงความสัมพันธ์ระหว่างคำนามกับส่วนอื่นในประโยค",
-                    'examples': "in (ใน), on (บน), at (ที่), with (กับ), by (โดย)",
-                    'sentence': "The cat is on the table. / She walked with her friend."
-                },
-                'CONJ': {
-                    'desc': "คำสันธาน - คำที่เชื่อมคำ วลี หรือประโยคเข้าด้วยกัน",
-                    'examples': "and (และ), but (แต่), or (หรือ), because (เพราะ)",
-                    'sentence': "I like tea and coffee. / He ran because he was late."
-                },
-                'INTJ': {
-                    'desc': "คำอุทาน - คำที่แสดงอารมณ์หรือความรู้สึกอย่างฉับพลัน",
-                    'examples': "wow (ว้าว), oh (โอ้), ah (อา), ouch (โอ๊ย)",
-                    'sentence': "Wow! That's amazing. / Oh, I didn't see you there."
-                },
-                'NUM': {
-                    'desc': "คำบอกจำนวน - คำที่แสดงจำนวนหรือลำดับ",
-                    'examples': "one (หนึ่ง), two (สอง), first (ที่หนึ่ง), second (ที่สอง)",
-                    'sentence': "I have two cats. / She won first place in the competition."
-                },
-                'AUX': {
-                    'desc': "คำช่วยกริยา - คำที่ช่วยคำกริยาหลักในการแสดงกาล มุมมอง หรือทัศนคติ",
-                    'examples': "can (สามารถ), will (จะ), must (ต้อง), should (ควร)",
-                    'sentence': "You should study. / He can swim very well."
-                },
-                'PART': {
-                    'desc': "อนุภาค - คำที่ทำหน้าที่เฉพาะทางไวยากรณ์",
-                    'examples': "to (ใน 'to go'), 's (ใน 'John's')",
-                    'sentence': "I want to sleep. / That's John's book."
-                }
-            },
-            'th': {
-                'NOUN': {
-                    'desc': "คำนาม - คำที่เป็นชื่อคน สถานที่ สิ่งของ หรือแนวคิด",
-                    'examples': "แมว (cat), เมือง (city), ความสุข (happiness), สมชาย (personal name)",
-                    'sentence': "แมวนอนอยู่บนโซฟา / ความสุขของฉันมาจากการช่วยเหลือผู้อื่น"
-                },
-                'VERB': {
-                    'desc': "คำกริยา - คำที่แสดงการกระทำหรือสถานะ",
-                    'examples': "วิ่ง (run), กิน (eat), คิด (think), นอน (sleep)",
-                    'sentence': "เธอวิ่งทุกเช้า / ฉันคิดถึงคุณ"
-                },
-                'ADJ': {
-                    'desc': "คำคุณศัพท์ - คำที่ขยายความคำนาม",
-                    'examples': "มีความสุข (happy), สีเขียว (green), สวยงาม (beautiful)",
-                    'sentence': "เด็กที่มีความสุขกำลังเล่น / เธอมีดวงตาที่สวยงาม"
-                },
-                'ADV': {
-                    'desc': "คำวิเศษณ์ - คำที่ขยายความคำกริยา คำคุณศัพท์ หรือคำวิเศษณ์อื่น",
-                    'examples': "อย่างรวดเร็ว (quickly), มาก (very), อย่างยิ่ง (extremely)",
-                    'sentence': "เขาวิ่งอย่างรวดเร็ว / เธอฉลาดมาก"
-                },
-                'PRON': {
-                    'desc': "คำสรรพนาม - คำที่ใช้แทนคำนาม",
-                    'examples': "ฉัน (I), คุณ (you), เขา (he/she), มัน (it), พวกเขา (they)",
-                    'sentence': "เธอให้มันแก่ฉัน / พวกเขาไปที่ร้านค้า"
-                },
-                'DET': {
-                    'desc': "คำนำหน้านาม - คำที่นำหน้าและกำหนดความชัดเจนของคำนาม",
-                    'examples': "นี้ (this), นั้น (that), เหล่านี้ (these), นั่น (those)",
-                    'sentence': "หนังสือเล่มนี้น่าสนใจ / เด็กคนนั้นกำลังวิ่ง"
-                },
-                'ADP': {
-                    'desc': "คำบุพบท - คำที่แสดงความสัมพันธ์ระหว่างคำนามกับส่วนอื่นในประโยค",
-                    'examples': "ใน (in), บน (on), ที่ (at), กับ (with), โดย (by)",
-                    'sentence': "แมวอยู่บนโต๊ะ / เธอเดินไปกับเพื่อนของเธอ"
-                },
-                'CONJ': {
-                    'desc': "คำสันธาน - คำที่เชื่อมคำ วลี หรือประโยคเข้าด้วยกัน",
-                    'examples': "และ (and), แต่ (but), หรือ (or), เพราะ (because)",
-                    'sentence': "ฉันชอบชาและกาแฟ / เขาวิ่งเพราะเขามาสาย"
-                },
-                'INTJ': {
-                    'desc': "คำอุทาน - คำที่แสดงอารมณ์หรือความรู้สึกอย่างฉับพลัน",
-                    'examples': "ว้าว (wow), โอ้ (oh), อา (ah), โอ๊ย (ouch)",
-                    'sentence': "ว้าว! นั่นมหัศจรรย์มาก / โอ้ ฉันไม่เห็นคุณอยู่ตรงนั้น"
-                },
-                'NUM': {
-                    'desc': "คำบอกจำนวน - คำที่แสดงจำนวนหรือลำดับ",
-                    'examples': "หนึ่ง (one), สอง (two), ที่หนึ่ง (first), ที่สอง (second)",
-                    'sentence': "ฉันมีแมวสองตัว / เธอชนะที่หนึ่งในการแข่งขัน"
-                },
-                'AUX': {
-                    'desc': "คำช่วยกริยา - คำที่ช่วยคำกริยาหลักในการแสดงกาล มุมมอง หรือทัศนคติ",
-                    'examples': "จะ (will), ได้ (can), ต้อง (must), ควร (should)",
-                    'sentence': "คุณควรจะศึกษา / เขาสามารถว่ายน้ำได้ดีมาก"
-                },
-                'PART': {
-                    'desc': "อนุภาค - คำที่ทำหน้าที่เฉพาะทางไวยากรณ์",
-                    'examples': "ได้, ไหม, นะ, สิ, เลย",
-                    'sentence': "คุณไปได้ไหม / กินข้าวกันนะ"
-                }
-            }
-        }
-        
-        pos_categories = st.session_state.game.pos_categories[language]
-        
-        # แสดงคำอธิบายและตัวอย่างในรูปแบบตาราง
-        st.markdown("""
-        <style>
-        .pos-table {
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-        }
-        .pos-table th, .pos-table td {
-            border: 1px solid #ddd;
-            padding: 8px 12px;
-            text-align: left;
-        }
-        .pos-table th {
-            background-color: #f0f2f6;
-            font-weight: bold;
-        }
-        .pos-table tr:nth-child(even) {
-            background-color: #f9f9f9;
-        }
-        .pos-table tr:hover {
-            background-color: #e6f2ff;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        # สร้างตาราง HTML 
-        html_table = "<table class='pos-table'>"
-        html_table += f"<tr><th>Part of Speech</th><th>Description / คำอธิบาย</th><th>Examples / ตัวอย่าง</th><th>Sentence / ประโยคตัวอย่าง</th></tr>"
-        
-        for pos_code, pos_name in pos_categories.items():
-            if pos_code in pos_examples[language]:
-                desc = pos_examples[language][pos_code]['desc']
-                examples = pos_examples[language][pos_code]['examples']
-                sentence = pos_examples[language][pos_code]['sentence']
-                html_table += f"<tr><td><b>{pos_name}</b> ({pos_code})</td><td>{desc}</td><td>{examples}</td><td>{sentence}</td></tr>"
-        
-        html_table += "</table>"
-        st.markdown(html_table, unsafe_allow_html=True)
+        # แสดงคำอธิบายและตัวอย่างในรูปแบบตาราง (HTML แคชไว้ต่อภาษา)
+        st.markdown(_render_pos_reference_html(language), unsafe_allow_html=True)
     
     else:
         # เพิ่มปุ่ม Back กลับไปหน้าหลัก
@@ -557,113 +774,78 @@ def main():
         
         # สร้างตารางสวยงาม
         data = []
-        for i, word_info in enumerate(st.session_state.word_infos):
-            # Get POS options based on language
-            pos_options = st.session_state.game.pos_categories[language]
-            
-            # Add empty option
-            options = [("", "Select...")] + [(pos, name) for pos, name in pos_options.items()]
-            
-            # Create selectbox for POS selection
-            selected = st.selectbox(
-                f"**{word_info.word}**",
-                options=options,
-                format_func=lambda x: x[1],
-                key=f"pos_select_{i}",
-                disabled=st.session_state.answers_submitted  # Disable after submission
-            )
+        # Wrap the word selectboxes in a form so Streamlit reruns once on
+        # submit instead of once per selectbox change
+        # POS options with an empty entry, built once for the whole word loop
+        options = [("", "Select...")] + list(st.session_state.game.pos_categories[language].items())
+
+        with st.form("pos_form"):
+            for i, word_info in enumerate(st.session_state.word_infos):
+                # Create selectbox for POS selection
+                selected = st.selectbox(
+                    f"**{word_info.word}**",
+                    options=options,
+                    format_func=lambda x: x[1],
+                    key=f"pos_select_{i}",
+                    disabled=st.session_state.answers_submitted  # Disable after submission
+                )
             
-            # Update user answer
-            word_info.user_answer = selected[0] if selected else ""
+                # Update user answer
+                word_info.user_answer = selected[0] if selected else ""
             
-            # Check if all words have been answered
-            if not word_info.user_answer:
-                all_answered = False
+                # Check if all words have been answered
+                if not word_info.user_answer:
+                    all_answered = False
             
-            # Check if answer is correct
-            word_info.is_correct = word_info.user_answer == word_info.pos
+                # Check if answer is correct
+                word_info.is_correct = word_info.user_answer == word_info.pos
             
-            # ตรวจสอบว่า pos_name มีค่าหรือไม่ ถ้าไม่มีให้ตั้งค่าจาก pos_categories
-            if not hasattr(word_info, 'pos_name') or not word_info.pos_name:
-                word_info.pos_name = st.session_state.game.pos_categories[language].get(word_info.pos, word_info.pos)
+                # ตรวจสอบว่า pos_name มีค่าหรือไม่ ถ้าไม่มีให้ตั้งค่าจาก pos_categories
+                if not hasattr(word_info, 'pos_name') or not word_info.pos_name:
+                    word_info.pos_name = st.session_state.game.pos_categories[language].get(word_info.pos, word_info.pos)
                 
-            # เพิ่มข้อมูลในตาราง
-            if st.session_state.answers_submitted:
-                if word_info.is_correct:
-                    result = "✅ Correct!"
-                else:
-                    result = "❌ Incorrect"
+                # เพิ่มข้อมูลในตาราง
+                if st.session_state.answers_submitted:
+                    if word_info.is_correct:
+                        result = "✅ Correct!"
+                    else:
+                        result = "❌ Incorrect"
                     
-                # เพิ่มข้อมูลคำ, คำตอบของผู้เล่น, ผลลัพธ์, และเฉลย
-                data.append([word_info.word, 
-                             selected[1] if selected else "", 
-                             result, 
-                             word_info.pos_name])
-            else:
-                # เพิ่มข้อมูลสำหรับกรณีที่ยังไม่ได้ส่งคำตอบ
-                data.append([word_info.word, 
-                             selected[1] if selected else "", 
-                             "", 
-                             ""])
-        
+                    # เพิ่มข้อมูลคำ, คำตอบของผู้เล่น, ผลลัพธ์, และเฉลย
+                    data.append([word_info.word, 
+                                 selected[1] if selected else "", 
+                                 result, 
+                                 word_info.pos_name])
+                else:
+                    # เพิ่มข้อมูลสำหรับกรณีที่ยังไม่ได้ส่งคำตอบ
+                    data.append([word_info.word, 
+                                 selected[1] if selected else "", 
+                                 "", 
+                                 ""])
+
+            submitted = st.form_submit_button(
+                "✅ Submit Answers / ส่งคำตอบ",
+                type="primary",
+                disabled=st.session_state.answers_submitted
+            )
+
         # แสดงตารางสรุปเมื่อส่งคำตอบแล้ว
         if st.session_state.answers_submitted:
             st.markdown("<h3 style='text-align: center;'>📝 สรุปผล / Results</h3>", unsafe_allow_html=True)
-            df = pd.DataFrame(data, columns=["Word / คำ", 
-                                           "Your Answer / คำตอบของคุณ", 
-                                           "Result / ผลลัพธ์", 
-                                           "Correct Answer / เฉลย"])
-            
-            # ใช้ตารางแบบใหม่ที่มีการจัดกึ่งกลาง
-            # สร้าง CSS สำหรับตารางที่สวยงาม
-            st.markdown("""
-            <style>
-            .table-container {
-                display: flex;
-                justify-content: center;
-                margin: 20px 0;
-            }
-            .centered-df {
-                width: 90%;
-                margin: 0 auto;
-                border-collapse: collapse;
-                box-shadow: 0 2px 3px rgba(0,0,0,0.1);
-            }
-            .centered-df th, .centered-df td {
-                text-align: center !important;
-                padding: 10px;
-                border: 1px solid #ddd;
-            }
-            .centered-df th {
-                background-color: #f0f2f6;
-                font-weight: bold;
-            }
-            .centered-df tr:nth-child(even) {
-                background-color: #f9f9f9;
-            }
-            .centered-df tr:hover {
-                background-color: #e6f2ff;
-            }
-            </style>
-            """, unsafe_allow_html=True)
-            
-            # แปลง DataFrame เป็น HTML และใส่ class สำหรับการจัดกึ่งกลาง
-            html_table = df.to_html(index=False, classes='centered-df')
-            # ใส่ div ครอบตารางเพื่อจัดกึ่งกลาง
-            html_table = f'<div class="table-container">{html_table}</div>'
-            st.markdown(html_table, unsafe_allow_html=True)
+
+            # แปลงเป็น HTML ผ่านฟังก์ชันที่แคชไว้ (rerun หลังส่งคำตอบได้ cache hit)
+            st.markdown(_render_results_table(tuple(map(tuple, data))), unsafe_allow_html=True)
         
-        # Submit button - only show if not yet submitted and all questions answered
-        if not st.session_state.answers_submitted:
+        # Handle the batched form submission
+        if submitted and not st.session_state.answers_submitted:
             if all_answered:
-                if st.button("✅ Submit Answers / ส่งคำตอบ", type="primary"):
-                    st.session_state.answers_submitted = True
-                    
-                    # Update score
-                    current_score = sum(1 for word_info in st.session_state.word_infos if word_info.is_correct)
-                    st.session_state.score = current_score
-                    
-                    st.rerun()
+                st.session_state.answers_submitted = True
+
+                # Update score
+                current_score = sum(1 for word_info in st.session_state.word_infos if word_info.is_correct)
+                st.session_state.score = current_score
+
+                st.rerun()
             else:
                 st.warning("Please answer all questions before submitting / กรุณาตอบคำถามทั้งหมดก่อนส่งคำตอบ")
         
@@ -690,10 +872,35 @@ def main():
                 difficulty = st.session_state.difficulty_select
                 api_url = st.session_state.get('api_url', None)
                 
-                # สร้างประโยคใหม่ทันที
-                sentence, actual_difficulty = st.session_state.game.generate_sentence_with_llm(language, difficulty, api_url)
+                # ใช้ประโยคที่ prefetch ไว้ในพื้นหลังถ้าเสร็จแล้ว ไม่ต้องรอ API
+                future = st.session_state.get('next_future')
+                prefetch_result = None
+                if future is not None and future.done():
+                    try:
+                        prefetch_result = future.result(timeout=0.1)
+                    except Exception:
+                        prefetch_result = None
+
+                if prefetch_result is not None:
+                    sentence, actual_difficulty, word_infos = prefetch_result
+                    st.session_state.word_infos = word_infos
+                else:
+                    # สร้างประโยคใหม่ทันที
+                    sentence, actual_difficulty = st.session_state.game.generate_sentence_with_llm(language, difficulty, api_url)
+
+                    # ใช้ผลวิเคราะห์ที่ prefetch ไว้ถ้ามี (ไม่ต้องเรียก spaCy ซ้ำ)
+                    prefetched = st.session_state.get('prefetched', {}).get((language, difficulty), {})
+                    if sentence in prefetched:
+                        st.session_state.word_infos = prefetched[sentence]
+                    else:
+                        st.session_state.word_infos = st.session_state.game.analyze_sentence(sentence, language)
+
                 st.session_state.current_sentence = sentence
-                st.session_state.word_infos = st.session_state.game.analyze_sentence(sentence, language)
+
+                # Prefetch the round after this one
+                if 'executor' in st.session_state:
+                    st.session_state.next_future = st.session_state.executor.submit(
+                        _fetch_and_analyze, st.session_state.game, language, difficulty, api_url)
                 st.session_state.score = 0
                 st.session_state.total_words = len(st.session_state.word_infos)
                 st.session_state.answers_submitted = False